@@ -1,8 +1,14 @@
-from collections import UserDict
-from datetime import datetime, timedelta
-import pickle
+from bisect import bisect_left, insort
+from calendar import isleap
+from datetime import date, datetime, timedelta
+import json
+import os
+import re
+import sys
 
 class Field:
+    __slots__ = ("value",)
+
     def __init__(self, value):
         self.value = value
 
@@ -10,139 +16,284 @@ class Field:
         return str(self.value)
 
 
-class Name(Field):
-    def __init__(self, name):
-        super().__init__(name)
+_PHONE_RE = re.compile(r'\d{10}\Z').match
+
 
+def _validate_phone(phone):
+    if not _PHONE_RE(phone):
+        raise ValueError("Phone number must be exactly 10 digits")
+    return phone
 
-class Phone(Field):
-    def __init__(self, phone):
-        super().__init__(phone)
-        if len(self.value) != 10:
-            raise ValueError("Phone number must be exactly 10 digits")
-        if not phone.isdigit():
-            raise ValueError("Phone number must be exactly only digits")
+
+def _parse_ddmmyyyy(value):
+    # Формат DD.MM.YYYY розбираємо вручну, без strptime
+    if len(value) == 10 and value[2] == '.' and value[5] == '.':
+        day, month, year = value[0:2], value[3:5], value[6:10]
+    else:
+        # Як і strptime, приймаємо день і місяць з однієї цифри (1.1.2000)
+        parts = value.split('.')
+        if len(parts) != 3:
+            raise ValueError("Invalid date format. Use DD.MM.YYYY")
+        day, month, year = parts
+        if not (0 < len(day) <= 2 and 0 < len(month) <= 2 and len(year) == 4):
+            raise ValueError("Invalid date format. Use DD.MM.YYYY")
+    # strptime також приймає пробіл замість нуля попереду (" 1.02.2000")
+    if day[0] == ' ':
+        day = day[1:]
+    if not (day + month + year).isdigit():
+        raise ValueError("Invalid date format. Use DD.MM.YYYY")
+    return date(int(year), int(month), int(day))
 
 
 class Birthday(Field):
+    __slots__ = ("date",)
+
     def __init__(self, value):
         try:
-            datetime.strptime(value, '%d.%m.%Y')
+            self.date = _parse_ddmmyyyy(value)
         except ValueError:
             raise ValueError("Invalid date format. Use DD.MM.YYYY")
         super().__init__(value)
 
     def is_valid(self):
-        try:
-            b_date = datetime.strptime(self.value, '%d.%m.%Y')
-            today = datetime.now()
-            return b_date < today
-        except ValueError:
-            return False
+        return self.date <= datetime.now().date()
     def __str__(self):
         return self.value
 
 class Record:
+    __slots__ = ("name", "phones", "birthday", "_book")
+
     def __init__(self, name):
-        self.name = Name(name)
-        self.phones = []
+        self.name = name
+        self.phones = {}  # номер -> None, впорядкована множина номерів
         self.birthday = None
+        self._book = None
+
+    def _changed(self):
+        if self._book is not None:
+            self._book._record_changed(self)
 
     def add_phone(self, phone):
-        self.phones.append(Phone(phone))
+        self.phones[_validate_phone(phone)] = None
+        self._changed()
 
     def remove_phone(self, phone):
-        for p in self.phones:
-            if p.value == phone:
-                self.phones.remove(p)
+        if phone in self.phones:
+            del self.phones[phone]
+            self._changed()
 
     def edit_phone(self, old_phone, new_phone):
-        if old_phone in [p.value for p in self.phones]:
-            for p in self.phones:
-                if p.value == old_phone:
-                    p.value = new_phone
-        else:
+        if old_phone not in self.phones:
             raise ValueError(f'This number: {old_phone} does not exist')
+        _validate_phone(new_phone)
+        del self.phones[old_phone]
+        self.phones[new_phone] = None
+        self._changed()
 
     def find_phone(self, phone):
-        for p in self.phones:
-            if p.value == phone:
-                return p
+        return phone if phone in self.phones else None
 
     def add_birthday(self, birthday):
         b_day = Birthday(birthday)
         if b_day.is_valid():
+            if self._book is not None:
+                self._book._unindex_birthday(self)
             self.birthday = b_day
+            if self._book is not None:
+                self._book._index_birthday(self)
+            self._changed()
         else:
             raise ValueError("Birthday cannot be in the future!")
 
     def __str__(self):
-        phone_str = '; '.join(p.value for p in self.phones)
+        phone_str = '; '.join(self.phones)
         birthday_str = self.birthday.value if self.birthday else 'No birthday'
-        return f"Contact name: {self.name.value}, phones: {phone_str}, Birthday: {birthday_str}"
+        return f"Contact name: {self.name}, phones: {phone_str}, Birthday: {birthday_str}"
+
+
+def _record_to_dict(record):
+    return {
+        "phones": list(record.phones),
+        "birthday": record.birthday.value if record.birthday else None,
+    }
+
+
+def _record_from_dict(name, fields):
+    record = Record(name)
+    for phone in fields["phones"]:
+        record.add_phone(phone)
+    if fields["birthday"]:
+        record.add_birthday(fields["birthday"])
+    return record
+
+
+def _bday_key(month, day):
+    return month * 32 + day
+
+
+def _birthday_in_year(bday, year):
+    try:
+        return bday.replace(year=year)
+    except ValueError:
+        return date(year, 3, 1)  # 29 лютого у невисокосний рік святкуємо 1 березня
+
+
+class AddressBook(dict):
+    def __init__(self, *args, **kwargs):
+        self._bday_index = []  # відсортовані пари (ключ дня народження, ім'я)
+        self._journal_path = None  # журнал змін, задається в load_data
+        super().__init__(*args, **kwargs)
 
-class AddressBook(UserDict):
     def add_record(self, record):
-        self.data[record.name.value] = record
+        key = record.name = sys.intern(record.name)
+        old = self.get(key)
+        if old is not None:
+            self._unindex_birthday(old)
+            old._book = None
+        self[key] = record
+        record._book = self
+        self._index_birthday(record)
+        self._record_changed(record)
 
     def find(self, name):
-        return self.data.get(name)
+        return self.get(name)
 
     def delete(self, name):
-        if name in self.data:
-            del self.data[name]
-            return f'Contact {name} deleted'
-        else:
+        record = self.pop(name, None)
+        if record is None:
             return f'Contact {name} not found'
+        self._unindex_birthday(record)
+        record._book = None
+        self._append_journal({"name": name, "deleted": True})
+        return f'Contact {name} deleted'
+
+    def _record_changed(self, record):
+        self._append_journal({"name": record.name, **_record_to_dict(record)})
+
+    def _append_journal(self, entry):
+        if self._journal_path is not None:
+            with open(self._journal_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def _index_birthday(self, record):
+        if record.birthday:
+            bday = record.birthday.date
+            insort(self._bday_index, (_bday_key(bday.month, bday.day), record.name))
+
+    def _unindex_birthday(self, record):
+        if record.birthday:
+            bday = record.birthday.date
+            entry = (_bday_key(bday.month, bday.day), record.name)
+            i = bisect_left(self._bday_index, entry)
+            if i < len(self._bday_index) and self._bday_index[i] == entry:
+                del self._bday_index[i]
 
     def get_upcoming_birthdays(self):
         today = datetime.now().date()
+        end = today + timedelta(days=7)
+        low = _bday_key(today.month, today.day)
+        if (today.month, today.day) == (3, 1) and not isleap(today.year):
+            low = _bday_key(2, 29)
+        if end.year == today.year:
+            ranges = [(low, _bday_key(end.month, end.day), today.year)]
+        else:  # тиждень переходить через 31 грудня
+            ranges = [(low, _bday_key(12, 31), today.year), (0, _bday_key(end.month, end.day), end.year)]
+        today_ord = today.toordinal()
+        today_wd = today.weekday()
         upcoming_birthdays = []
-        for record in self.data.values():
-            if record.birthday:
-                bday = datetime.strptime(record.birthday.value, '%d.%m.%Y').date()
-                bday_this_year = bday.replace(year=today.year)
-                if 0 <= (bday_this_year - today).days < 8:
-                    while bday_this_year.weekday() > 4:  # Якщо день народження випадає на вихідний
-                        bday_this_year += timedelta(days=1)
-                    upcoming_birthdays.append(
-                        f"Name: {record.name.value}, upcoming birthday: {bday_this_year.strftime('%d.%m.%Y')}"
-                    )
+        for low, high, year in ranges:
+            start = bisect_left(self._bday_index, (low,))
+            stop = bisect_left(self._bday_index, (high + 1,))
+            for _, name in self._bday_index[start:stop]:
+                bday_ord = _birthday_in_year(self[name].birthday.date, year).toordinal()
+                wd = (today_wd + bday_ord - today_ord) % 7
+                if wd > 4:  # Якщо день народження випадає на вихідний
+                    bday_ord += 7 - wd
+                upcoming_birthdays.append(
+                    f"Name: {name}, upcoming birthday: {date.fromordinal(bday_ord).strftime('%d.%m.%Y')}"
+                )
         return upcoming_birthdays
 
     def __str__(self):
-        result = []
-        for record in self.data.values():
-            result.append(str(record))
-        return '\n'.join(result)
-
-def delete(args, book):
-    name = args[0]
-    return book.delete(name)
+        return '\n'.join(str(record) for record in self.values())
 
 #----------------------------------------------------------------
 
-def save_data(book, filename="addressbook.pkl"):
-    with open(filename, "wb") as f:
-        pickle.dump(book, f)
-
-def load_data(filename="addressbook.pkl"):
+def _journal_path(filename):
+    return os.path.splitext(filename)[0] + ".journal"
+
+def _move_aside(filename):
+    # Не перезаписуємо попередні копії: .corrupt, .corrupt.1, .corrupt.2, ...
+    target = filename + ".corrupt"
+    n = 0
+    while os.path.exists(target):
+        n += 1
+        target = f"{filename}.corrupt.{n}"
+    os.rename(filename, target)
+    return target
+
+def save_data(book, filename="addressbook.json"):
+    # Повний знімок книги; після запису журнал змін більше не потрібен
+    payload = {name: _record_to_dict(record) for name, record in book.items()}
+    data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    tmp_filename = filename + ".tmp"
+    with open(tmp_filename, "wb") as f:
+        f.write(data)
+    os.replace(tmp_filename, filename)
     try:
-        with open(filename, "rb") as f:
-            return pickle.load(f)
+        os.remove(_journal_path(filename))
     except FileNotFoundError:
-        return AddressBook()  # Повернення нової адресної книги, якщо файл не знайдено
+        pass
+
+def load_data(filename="addressbook.json"):
+    book = AddressBook()  # Нова адресна книга, якщо файл не знайдено
+    if os.path.isfile(filename):
+        with open(filename, "rb") as f:
+            data = f.read()
+        try:
+            payload = json.loads(data)
+            if not isinstance(payload, dict):
+                raise ValueError("Address book file must contain an object")
+            for name, fields in payload.items():
+                book.add_record(_record_from_dict(name, fields))
+        except (ValueError, KeyError, TypeError, AttributeError):
+            # Зберігаємо пошкоджений файл, щоб не перезаписати його при виході
+            book = AddressBook()
+            corrupt = _move_aside(filename)
+            print(f"Address book file is corrupt, moved it to {corrupt}")
+
+    journal = _journal_path(filename)
+    if os.path.isfile(journal):
+        with open(journal, "rb") as f:
+            lines = f.readlines()
+        for i, line in enumerate(lines):
+            try:
+                entry = json.loads(line)
+                if entry.get("deleted"):
+                    book.delete(entry["name"])
+                else:
+                    book.add_record(_record_from_dict(entry["name"], entry))
+            except (ValueError, KeyError, TypeError, AttributeError):
+                # Недописаний останній рядок після збою просто відкидаємо;
+                # пошкоджений рядок посередині - зберігаємо журнал окремо
+                if i < len(lines) - 1 or line.endswith(b"\n"):
+                    corrupt = _move_aside(journal)
+                    print(f"Journal file is corrupt, moved it to {corrupt}")
+                break
+        save_data(book, filename)  # ущільнюємо журнал у знімок і видаляємо його
+    book._journal_path = journal
+    return book
 
 #-----------------------------------------------------------------
 
 def input_error(func):
-    def wrapper(*args, book, **kwargs):
+    def wrapper(args, book):
         try:
-            return func(*args, book, **kwargs)
+            return func(args, book)
         except KeyError:
             return "Name not found. Please, check and try again."
         except ValueError as e:
-            return e
+            return str(e)
         except IndexError:
             return "Enter correct information."
 
@@ -185,20 +336,19 @@ def show_phone(args, book: AddressBook):
     name = args[0]
     record = book.find(name)
     if record:
-        return "; ".join([p.value for p in record.phones])
+        return "; ".join(record.phones)
     else:
         return f'Contact {name} not found.'
 
 
-@input_error
 def show_all(book: AddressBook):
-    return "\n".join([str(record) for record in book.data.values()])
+    return "\n".join(str(record) for record in book.values())
 
 
 def parse_input(user_input):
-    parts = user_input.split()
-    cmd = parts[0].strip().lower()
-    args = parts[1:]
+    head, *rest = user_input.split(None, 1) or [""]
+    cmd = head.lower()
+    args = rest[0].split() if rest else []
     return cmd, args
 
 
@@ -227,42 +377,68 @@ def show_birthday(args, book: AddressBook):
         return f"Birthday for {name} not found."
 
 
+@input_error
+def delete(args, book: AddressBook):
+    name = args[0]
+    return book.delete(name)
+
+
+HANDLERS = {
+    "add": add_contact,
+    "change": change_contact,
+    "phone": show_phone,
+    "add-birthday": add_birthday,
+    "show-birthday": show_birthday,
+    "delete": delete,
+}
+
+OUTPUT_BATCH = 64  # скільки відповідей накопичувати перед записом у stdout
+
+
+def run_command(command, args, book):
+    handler = HANDLERS.get(command)
+    if handler:
+        return handler(args, book=book)
+    elif command == "hello":
+        return "How can I help you?"
+    elif command == "all":
+        return show_all(book=book)
+    elif command == "birthdays":
+        birthdays = book.get_upcoming_birthdays()
+        if not birthdays:
+            return "There are no upcoming birthdays."
+        return "\n".join(birthdays)
+    else:
+        return "Invalid command"
+
 
 def main():
     book = load_data()
     print("Welcome to the assistant bot!")
-    while True:
-        user_input = input("Enter a command: ")
-        command, args = parse_input(user_input)
-        if command in ["close", "exit"]:
-            save_data(book)
-            print("Good bye!")
-            break
-        elif command == "hello":
-            print("How can I help you?")
-        elif command == "add":
-            print(add_contact(args, book=book))
-        elif command == "change":
-            print(change_contact(args, book=book))
-        elif command == "phone":
-            print(show_phone(args, book=book))
-        elif command == "all":
-            print(show_all(book=book))
-        elif command == "add-birthday":
-            print(add_birthday(args, book=book))
-        elif command == "show-birthday":
-            print(show_birthday(args, book=book))
-        elif command == "birthdays":
-            birthdays = book.get_upcoming_birthdays()
-            if not len(birthdays):
-                print("There are no upcoming birthdays.")
-                continue
-            for day in birthdays:
-                print(f"{day}")
-        elif command == "delete":
-            print(delete(args, book=book))
-        else:
-            print("Invalid command")
+    if sys.stdin.isatty():
+        while True:
+            user_input = input("Enter a command: ")
+            command, args = parse_input(user_input)
+            if command in ("close", "exit"):
+                break
+            print(run_command(command, args, book))
+    else:
+        # Команди зі скрипта: відповіді пишемо пачками, а не print на кожну
+        out = sys.stdout.write
+        buf = []
+        try:
+            for user_input in sys.stdin:
+                command, args = parse_input(user_input)
+                if command in ("close", "exit"):
+                    break
+                buf.append(run_command(command, args, book) + "\n")
+                if len(buf) >= OUTPUT_BATCH:
+                    out("".join(buf))
+                    buf.clear()
+        finally:
+            out("".join(buf))  # не губимо відповіді, навіть якщо команда впала
+    save_data(book)
+    print("Good bye!")
 
 if __name__ ==  "__main__":
-    main()
\ No newline at end of file
+    main()